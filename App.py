@@ -1,16 +1,27 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import requests
-import matplotlib.pyplot as plt
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import numpy as np
 import pandas as pd
-import feedparser
-from transformers import pipeline
-
-# --- Sentiment model ---
-@st.cache_resource
-def load_sentiment_model():
-    return pipeline("sentiment-analysis")
-
-sentiment_model = load_sentiment_model()
+import requests
+from cache import redis_cache
+from feeds import parse_feed
+from http_client import SESSION, TIMEOUT
+from indicators import compute_indicators
+from sentiment import analyze_sentiment, get_model
+
+# Load (and warm) the shared sentiment model at startup, not on the first headline
+get_model()
+
+# --- Run a function on a worker thread with the current script context attached ---
+def in_script_ctx(fn):
+    ctx = get_script_run_ctx()
+    def run(*args):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+    return run
 
 # --- Priority map for popular cryptos ---
 PRIORITY_IDS = {
@@ -19,40 +30,66 @@ PRIORITY_IDS = {
     "dot": "polkadot", "pol": "polygon", "dash": "dash", "etc": "ethereum classic"
 }
 
+# --- CoinGecko coin list indexed by symbol, id and name (changes rarely) ---
+# cache_resource rather than cache_data: the index is read-only, so reruns can share
+# one object instead of unpickling thousands of entries each time
+@st.cache_resource(ttl=86400)
+@redis_cache(ttl=86400)
+def _coin_index():
+    coins = SESSION.get("https://api.coingecko.com/api/v3/coins/list", timeout=TIMEOUT).json()
+    if not isinstance(coins, list):
+        # Error body such as a 429 {"status": {...}}: raise so neither cache tier keeps it
+        raise LookupError("CoinGecko coin list unavailable")
+    by_symbol, by_id, by_name = {}, {}, {}
+    for coin in coins:
+        # setdefault keeps the first match, as the old linear scans did
+        by_symbol.setdefault(coin["symbol"].lower(), coin["id"])
+        by_id.setdefault(coin["id"].lower(), coin["id"])
+        by_name.setdefault(coin["name"].lower(), coin["id"])
+    return {"symbol": by_symbol, "id": by_id, "name": by_name}
+
 # --- Resolve CoinGecko ID ---
 def resolve_crypto_id(user_input):
     q = user_input.strip().lower()
     if q in PRIORITY_IDS:
         return PRIORITY_IDS[q]
-    coins = requests.get("https://api.coingecko.com/api/v3/coins/list").json()
-    for coin in coins:
-        if coin['symbol'].lower() == q:
-            return coin['id']
-    for coin in coins:
-        if coin['id'].lower() == q or coin['name'].lower() == q:
-            return coin['id']
-    return None
-
-# --- Get coin metadata (name, symbol) ---
-def get_coin_metadata(symbol_id):
     try:
-        url = f"https://api.coingecko.com/api/v3/coins/{symbol_id}"
-        data = requests.get(url, timeout=15).json()
-        return {"name": data.get("name", symbol_id), "symbol": data.get("symbol", symbol_id).upper()}
-    except Exception:
-        return {"name": symbol_id, "symbol": symbol_id.upper()}
-
-# --- Get price in USD/CAD ---
-def get_crypto_price(symbol_id):
-    url = f"https://api.coingecko.com/api/v3/simple/price?ids={symbol_id}&vs_currencies=usd,cad"
-    data = requests.get(url).json()
-    return data.get(symbol_id)
+        index = _coin_index()
+    except (requests.RequestException, LookupError):
+        st.error("Couldn't reach CoinGecko to look up this ticker. Please try again shortly.")
+        st.stop()
+    return index["symbol"].get(q) or index["id"].get(q) or index["name"].get(q)
+
+# --- Get coin metadata (name, symbol) and USD/CAD price in one call ---
+@st.cache_data(ttl=30)
+@redis_cache(ttl=30)
+def get_coin_data(symbol_id):
+    url = (
+        f"https://api.coingecko.com/api/v3/coins/{symbol_id}"
+        "?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false"
+    )
+    data = SESSION.get(url, timeout=TIMEOUT).json()
+    current = data.get("market_data", {}).get("current_price")
+    if not current:
+        # Error body (rate limit, unknown id): raise so neither cache tier keeps it
+        raise LookupError(f"No market data for {symbol_id}")
+    return {
+        "name": data.get("name", symbol_id),
+        "symbol": data.get("symbol", symbol_id).upper(),
+        "price": {"usd": current.get("usd"), "cad": current.get("cad")},
+    }
 
 # --- Get historical chart data ---
+@st.cache_data(ttl=300)
+@redis_cache(ttl=300)
 def get_crypto_chart(symbol_id):
     url = f"https://api.coingecko.com/api/v3/coins/{symbol_id}/market_chart?vs_currency=usd&days=30"
-    data = requests.get(url).json()
-    return data.get("prices", [])
+    data = SESSION.get(url, timeout=TIMEOUT).json()
+    prices = data.get("prices")
+    if not prices:
+        # Error body (rate limit, unknown id): raise so neither cache tier keeps it
+        raise LookupError(f"No chart data for {symbol_id}")
+    return prices
 
 # --- Calculate RSI & MACD ---
 def calculate_indicators(prices):
@@ -60,40 +97,23 @@ def calculate_indicators(prices):
     df["date"] = pd.to_datetime(df["timestamp"], unit="ms")
     df.set_index("date", inplace=True)
 
-    delta = df["price"].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-    loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-    rs = gain / loss
-    df["rsi"] = 100 - (100 / (1 + rs))
-
-    exp1 = df["price"].ewm(span=12, adjust=False).mean()
-    exp2 = df["price"].ewm(span=26, adjust=False).mean()
-    df["macd"] = exp1 - exp2
-    df["signal"] = df["macd"].ewm(span=9, adjust=False).mean()
+    rsi, macd, signal = compute_indicators(df["price"].to_numpy(dtype=np.float64))
+    df["rsi"] = rsi
+    df["macd"] = macd
+    df["signal"] = signal
 
     return df
 
 # --- Plot chart ---
 def plot_price_chart(df, label):
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 8), sharex=True)
-
-    ax1.plot(df.index, df["price"], label="Price (USD)")
-    ax1.set_title(f"{label} - Last 30 Days")
-    ax1.legend()
+    st.subheader(f"{label} - Last 30 Days")
+    st.line_chart(df[["price"]])
 
-    ax2.plot(df.index, df["rsi"], label="RSI", color="purple")
-    ax2.axhline(70, color="red", linestyle="--")
-    ax2.axhline(30, color="green", linestyle="--")
-    ax2.set_title("RSI (Relative Strength Index)")
-    ax2.legend()
+    st.subheader("RSI (Relative Strength Index)")
+    st.line_chart(df[["rsi"]])
 
-    ax3.plot(df.index, df["macd"], label="MACD", color="blue")
-    ax3.plot(df.index, df["signal"], label="Signal", color="orange")
-    ax3.axhline(0, color="black", linestyle="--")
-    ax3.set_title("MACD")
-    ax3.legend()
-
-    st.pyplot(fig)
+    st.subheader("MACD")
+    st.line_chart(df[["macd", "signal"]])
 
 # --- Interpret RSI & MACD ---
 def interpret_indicators(df):
@@ -117,17 +137,21 @@ def interpret_indicators(df):
         st.write("- MACD and signal are aligned → Sideways trend.")
 
 # --- Fetch news from RSS feeds ---
+# Headlines are kept as parallel lists: titles[i], urls[i] and sources[i] describe one story
+@redis_cache(ttl=60)
 def fetch_rss_news(feed_url, coin_name, ticker, source_name):
-    feed = feedparser.parse(feed_url)
-    query_terms = [coin_name.lower(), ticker.lower()]
-    headlines = []
-    for entry in feed.entries:
-        title = entry.title
-        link = entry.link
-        title_lower = title.lower()
-        if any(term in title_lower.split()[:6] for term in query_terms) or any(f" {term} " in f" {title_lower} " for term in query_terms):
-            headlines.append((title.strip(), link, source_name))
-    return headlines
+    # Whole-word match on the coin name or ticker
+    pattern = re.compile(rf"\b({re.escape(coin_name.lower())}|{re.escape(ticker.lower())})\b")
+    titles, urls = [], []
+    for title, link in parse_feed(feed_url):
+        if pattern.search(title.lower()):
+            titles.append(title.strip())
+            urls.append(link)
+            if len(titles) >= 5:  # fetch_crypto_news never shows more than 5
+                break
+    if not titles:
+        return {}  # falsy, so redis_cache doesn't pin an empty or failed fetch
+    return {"titles": titles, "urls": urls, "sources": [source_name] * len(titles)}
 
 def fetch_crypto_news(coin_name, ticker):
     sources = [
@@ -135,22 +159,33 @@ def fetch_crypto_news(coin_name, ticker):
         ("Bitcoin.com", f"https://news.bitcoin.com/feed/?s={coin_name.lower()}"),
         ("Coindesk", f"https://www.coindesk.com/search?query={coin_name.lower()}")  # fallback
     ]
-    headlines = []
-    for source_name, url in sources:
-        if "rss" in url or "feed" in url:
-            headlines += fetch_rss_news(url, coin_name, ticker, source_name)
-    return headlines[:5]
-
-# --- Sentiment analysis on headlines ---
-def analyze_sentiment(headlines):
-    results = []
-    for title, url, source in headlines:
-        try:
-            r = sentiment_model(title)[0]
-            results.append((title, r["label"], r["score"], url, source))
-        except Exception:
-            results.append((title, "UNKNOWN", 0.0, url, source))
-    return results
+    feeds = [(source_name, url) for source_name, url in sources if "rss" in url or "feed" in url]
+    # Feeds are independent, so fetch them concurrently and keep source order
+    with ThreadPoolExecutor(max_workers=len(feeds)) as pool:
+        jobs = [pool.submit(in_script_ctx(fetch_rss_news), url, coin_name, ticker, source_name)
+                for source_name, url in feeds]
+    # Feeds syndicate the same story; drop repeats so each one is scored only once
+    news = {"titles": [], "urls": [], "sources": []}
+    seen = set()
+    for job in jobs:
+        feed_news = job.result()
+        if not feed_news:
+            continue
+        for title, url, source in zip(feed_news["titles"], feed_news["urls"], feed_news["sources"]):
+            key = title.strip().lower()[:80]
+            if key in seen:
+                continue
+            seen.add(key)
+            news["titles"].append(title)
+            news["urls"].append(url)
+            news["sources"].append(source)
+    return {key: values[:5] for key, values in news.items()}
+
+# --- Show headlines with their sentiment ---
+def show_news(news):
+    labels, scores = analyze_sentiment(news["titles"])
+    for title, url, source, label, score in zip(news["titles"], news["urls"], news["sources"], labels, scores):
+        st.write(f"- [{title}]({url}) → {label} ({score:.2f}) — {source}")
 
 # --- UI ---
 st.title("TrendForge 🔥")
@@ -162,14 +197,23 @@ if ticker_input:
     symbol_id = resolve_crypto_id(ticker_input)
     if not symbol_id:
         st.error("Ticker not recognized. Showing general crypto news instead:")
-        headlines = fetch_crypto_news("crypto", "crypto")
-        sentiments = analyze_sentiment(headlines)
-        for title, label, score, url, source in sentiments:
-            st.write(f"- [{title}]({url}) → {label} ({score:.2f}) — {source}")
+        show_news(fetch_crypto_news("crypto", "crypto"))
         st.stop()
 
-    price = get_crypto_price(symbol_id)
-    chart_data = get_crypto_chart(symbol_id)
+    # Chart and coin data are independent; news only needs the coin name
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        chart_job = pool.submit(in_script_ctx(get_crypto_chart), symbol_id)
+        try:
+            coin = pool.submit(in_script_ctx(get_coin_data), symbol_id).result()
+        except (requests.RequestException, LookupError):
+            coin = {"name": symbol_id, "symbol": symbol_id.upper(), "price": None}
+        news_job = pool.submit(in_script_ctx(fetch_crypto_news), coin["name"], ticker_input)
+    price = coin["price"]
+    try:
+        chart_data = chart_job.result()
+    except (requests.RequestException, LookupError):
+        chart_data = []
+    news = news_job.result()
 
     if price:
         usd = price.get("usd")
@@ -186,11 +230,7 @@ if ticker_input:
         st.warning("Chart data unavailable.")
 
     st.write("**Latest News & Sentiment:**")
-    meta = get_coin_metadata(symbol_id)
-    headlines = fetch_crypto_news(meta["name"], ticker_input)
-    if headlines:
-        sentiments = analyze_sentiment(headlines)
-        for title, label, score, url, source in sentiments:
-            st.write(f"- [{title}]({url}) → {label} ({score:.2f}) — {source}")
+    if news["titles"]:
+        show_news(news)
     else:
         st.warning("No news found for this coin.")
@@ -0,0 +1,53 @@
+import functools
+import json
+import os
+
+import redis
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+_client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+
+try:
+    _client.ping()
+    _enabled = True
+except redis.RedisError:
+    # No Redis reachable: every cached function simply calls through
+    _enabled = False
+
+
+def get_json(key):
+    if not _enabled:
+        return None
+    try:
+        cached = _client.get(key)
+    except redis.RedisError:
+        return None
+    return None if cached is None else json.loads(cached)
+
+
+def set_json(key, value, ttl):
+    if not _enabled:
+        return
+    try:
+        _client.setex(key, ttl, json.dumps(value))
+    except redis.RedisError:
+        pass
+
+
+# --- TTL cache decorator, keyed on the call arguments ---
+def redis_cache(ttl):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = f"trendforge:{func.__name__}:{json.dumps(args)}"
+            cached = get_json(key)
+            if cached is not None:
+                return cached
+            result = func(*args)
+            # Empty results are usually API errors or rate limits; don't pin them
+            if result:
+                set_json(key, result, ttl)
+            return result
+        return wrapper
+    return decorator
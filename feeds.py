@@ -0,0 +1,61 @@
+import feedparser
+import requests
+from lxml import etree
+
+from cache import get_json, set_json
+from http_client import SESSION, TIMEOUT
+
+# Feeds are untrusted input: no entity expansion, no network lookups for DTDs
+_parser = etree.XMLParser(resolve_entities=False, no_network=True, recover=False)
+
+# How long a feed's validators (ETag / Last-Modified) and entries are kept in Redis
+VALIDATOR_TTL = 86400
+
+# In-process copy of the validators, checked before Redis
+_validated = {}
+
+
+# --- Extract (title, link) pairs from raw feed bytes ---
+def _parse_entries(content):
+    try:
+        root = etree.fromstring(content, _parser)
+        entries = [
+            ((item.findtext("title") or "").strip(), (item.findtext("link") or "").strip())
+            for item in root.iter("{*}item")
+        ]
+        entries = [(title, link) for title, link in entries if title and link]
+    except etree.XMLSyntaxError:
+        entries = []
+    if entries:
+        return entries
+    # Atom, RDF or malformed XML: let feedparser deal with it
+    feed = feedparser.parse(content)
+    return [(entry.title, entry.link) for entry in feed.entries if "title" in entry and "link" in entry]
+
+
+# --- Parse an RSS feed into (title, link) pairs, revalidating with the server ---
+def parse_feed(url):
+    key = f"trendforge:feed:{url}"
+    prior = _validated.get(url) or get_json(key)
+    headers = {}
+    if prior:
+        if prior["etag"]:
+            headers["If-None-Match"] = prior["etag"]
+        if prior["modified"]:
+            headers["If-Modified-Since"] = prior["modified"]
+    try:
+        resp = SESSION.get(url, headers=headers, timeout=TIMEOUT)
+    except requests.RequestException:
+        return []
+    if resp.status_code == 304 and prior:
+        # Unchanged since last fetch: no body to download or parse
+        _validated[url] = prior
+        return prior["entries"]
+
+    entries = _parse_entries(resp.content)
+    etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    if entries and (etag or modified):
+        record = {"etag": etag, "modified": modified, "entries": entries}
+        _validated[url] = record
+        set_json(key, record, VALIDATOR_TTL)
+    return entries
@@ -0,0 +1,13 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Default per-request timeout in seconds; nothing should hang a rerun indefinitely
+TIMEOUT = 5
+
+# One pooled session per process so repeat calls reuse TCP/TLS connections
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.3)),
+)
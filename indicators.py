@@ -0,0 +1,61 @@
+import numpy as np
+from numba import njit
+
+# Indicator kernels (compiled with Numba). Kept out of App.py, which Streamlit re-executes
+# on every rerun, so they compile / load from the disk cache once per process.
+
+@njit(cache=True)
+def _rsi(prices, window):
+    # Simple-average RSI, same values as the rolling(window).mean() formulation
+    n = len(prices)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    for i in range(1, n):
+        d = prices[i] - prices[i - 1]
+        if d > 0:
+            gains[i] = d
+        else:
+            losses[i] = -d
+    out = np.full(n, np.nan)
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(n):
+        gain_sum += gains[i]
+        loss_sum += losses[i]
+        if i >= window:
+            gain_sum -= gains[i - window]
+            loss_sum -= losses[i - window]
+        if i >= window - 1:
+            if loss_sum == 0.0:
+                out[i] = 100.0 if gain_sum > 0.0 else np.nan
+            else:
+                out[i] = 100.0 - 100.0 / (1.0 + gain_sum / loss_sum)
+    return out
+
+
+@njit(cache=True)
+def compute_indicators(prices: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rsi = _rsi(prices, 14)
+    # MACD in one pass: the 12/26 EMAs and the 9-period signal carried as scalars,
+    # same recurrence as pandas ewm(span=..., adjust=False).mean()
+    n = len(prices)
+    macd = np.empty(n)
+    signal = np.empty(n)
+    if n == 0:
+        return rsi, macd, signal
+    a12, a26, a9 = 2.0 / 13.0, 2.0 / 27.0, 2.0 / 10.0
+    e12 = e26 = prices[0]
+    sig = 0.0
+    for i in range(n):
+        if i > 0:
+            e12 = a12 * prices[i] + (1.0 - a12) * e12
+            e26 = a26 * prices[i] + (1.0 - a26) * e26
+        m = e12 - e26
+        sig = m if i == 0 else a9 * m + (1.0 - a9) * sig
+        macd[i] = m
+        signal[i] = sig
+    return rsi, macd, signal
+
+
+# Compile (or load from the on-disk cache) at import, not on the first chart
+compute_indicators(np.linspace(1.0, 2.0, 32))
@@ -1,15 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import feedparser
-from transformers import pipeline
+from feeds import parse_feed
+from sentiment import analyze_sentiment
 
 st.title("📰 General Crypto News & Sentiment")
 
-# Load sentiment model once
-sentiment_model = pipeline(
-    "sentiment-analysis",
-    model="distilbert/distilbert-base-uncased-finetuned-sst-2-english"
-)
-
 # Broad crypto news feeds
 feeds = [
     ("Cointelegraph", "https://cointelegraph.com/rss"),
@@ -18,18 +13,28 @@ feeds = [
     ("CryptoSlate", "https://cryptoslate.com/feed/")
 ]
 
+# Fetch every feed concurrently; total wait is the slowest feed, not the sum
+with ThreadPoolExecutor(max_workers=len(feeds)) as pool:
+    parsed = list(pool.map(parse_feed, [url for _, url in feeds]))
+
+entries = []
+for (source, _), feed_entries in zip(feeds, parsed):
+    for title, link in feed_entries[:5]:  # limit to 5 per source
+        entries.append((title, link, source))
+
+# Score every headline in a single batched call
+titles = [title for title, _, _ in entries]
+labels, scores = analyze_sentiment(titles)
+
 headlines = []
-for source, url in feeds:
-    feed = feedparser.parse(url)
-    for entry in feed.entries[:5]:  # limit to 5 per source
-        result = sentiment_model(entry.title)[0]
-        headlines.append({
-            "title": entry.title,
-            "link": entry.link,
-            "source": source,
-            "sentiment": result["label"],
-            "score": result["score"]
-        })
+for (title, link, source), label, score in zip(entries, labels, scores):
+    headlines.append({
+        "title": title,
+        "link": link,
+        "source": source,
+        "sentiment": label,
+        "score": score
+    })
 
 # Display results
 for h in headlines:
@@ -0,0 +1,50 @@
+import os
+
+import onnxruntime as ort
+import streamlit as st
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer, pipeline
+
+SENTIMENT_MODEL = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+ONNX_DIR = "onnx-sentiment"
+ONNX_FILE = "model_quantized.onnx"
+# Half the cores for inference so small containers aren't oversubscribed
+SENTIMENT_THREADS = max(1, (os.cpu_count() or 2) // 2)
+# Headlines are short; capping tokens keeps attention cost (quadratic in length) small
+HEADLINE_MAX_TOKENS = 48
+
+
+# --- Sentiment model (ONNX export, int8 dynamic quantization), one per process ---
+@st.cache_resource
+def get_model():
+    if not os.path.exists(os.path.join(ONNX_DIR, ONNX_FILE)):
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+        quantizer = ORTQuantizer.from_pretrained(model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=ONNX_DIR, quantization_config=qconfig)
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = SENTIMENT_THREADS
+    options.inter_op_num_threads = 1
+    model = ORTModelForSequenceClassification.from_pretrained(
+        ONNX_DIR, file_name=ONNX_FILE, provider="CPUExecutionProvider", session_options=options
+    )
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+    classifier = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+    classifier("warmup")  # pay session initialisation here, not on the first headline
+    return classifier
+
+
+# --- Sentiment analysis on headlines: returns parallel label and score lists ---
+def analyze_sentiment(titles):
+    if not titles:
+        return [], []
+    # Tokenize the whole batch once and call the model directly, bypassing the pipeline
+    classifier = get_model()
+    tokenizer, model = classifier.tokenizer, classifier.model
+    try:
+        enc = tokenizer(titles, padding=True, truncation=True, max_length=HEADLINE_MAX_TOKENS, return_tensors="pt")
+        scores, label_ids = model(**enc).logits.softmax(dim=-1).max(dim=-1)
+    except Exception:
+        return ["UNKNOWN"] * len(titles), [0.0] * len(titles)
+    return [model.config.id2label[i] for i in label_ids.tolist()], scores.tolist()